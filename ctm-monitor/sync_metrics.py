@@ -3,6 +3,7 @@
 Sync training metrics from L4 to GitHub for live monitoring.
 Runs on the L4 GPU instance, pushes metrics every 5 seconds.
 """
+import json
 import time
 import shutil
 import subprocess
@@ -14,6 +15,16 @@ REPO_DIR = Path.home() / "ctm-monitor-data"
 REPO_URL = "https://github.com/humanaiconvention/ctm-monitor.git"
 PUSH_INTERVAL = 5  # seconds
 MAX_SNAPSHOTS = 5  # keep last 5 snapshots
+SNAPSHOT_EVERY = 12  # cycles between snapshots (~1 min at PUSH_INTERVAL)
+MIRROR_MAX_BYTES = 64 * 1024 * 1024  # rotate the repo copy past this size
+MAX_ROTATED = 3  # keep last 3 rotated metrics files in the repo
+STATE_FILE = Path.home() / ".ctm-monitor-sync.json"  # mirror offset, survives restarts
+
+# Incremental mirror state: which source file we are following and how many
+# of its bytes are already in the repo copy
+_source_id = None
+_synced_bytes = 0
+_cycle = 0
 
 def setup_repo():
     """Clone or pull the repo."""
@@ -26,42 +37,137 @@ def setup_repo():
         print("Pulling latest...")
         subprocess.run(["git", "pull"], cwd=REPO_DIR, check=True)
 
+def load_offset(source_id, size):
+    """Saved mirror offset for source_id, or None when there is no usable state."""
+    try:
+        state = json.loads(STATE_FILE.read_text())
+        if tuple(state["source_id"]) == source_id and state["synced_bytes"] <= size:
+            return state["synced_bytes"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def save_offset():
+    """Persist the mirror offset so a restarted sync resumes instead of re-copying."""
+    tmp = STATE_FILE.with_name(STATE_FILE.name + ".tmp")
+    tmp.write_text(json.dumps({"source_id": list(_source_id), "synced_bytes": _synced_bytes}))
+    tmp.replace(STATE_FILE)
+
+def backfill_mirror(dest, stat):
+    """Overwrite dest with the last MIRROR_MAX_BYTES of SOURCE_FILE.
+
+    The tail is cut at a line boundary so the copy starts on a whole record.
+    Returns bytes written.
+    """
+    global _source_id, _synced_bytes
+    start = max(stat.st_size - MIRROR_MAX_BYTES, 0)
+    with open(SOURCE_FILE, "rb") as src:
+        src.seek(start)
+        data = src.read(stat.st_size - start)
+    if start > 0:
+        data = data[data.find(b"\n") + 1:]
+    dest.write_bytes(data)
+    _source_id = (stat.st_dev, stat.st_ino)
+    _synced_bytes = stat.st_size
+    save_offset()
+    return len(data)
+
+def mirror_metrics(dest):
+    """Append the bytes SOURCE_FILE gained since the last cycle to dest.
+
+    After a process start it resumes from the saved offset when that state
+    belongs to the current source file. Otherwise (no state, a new source, a
+    truncated source or a missing dest) it backfills dest from the source.
+    Returns bytes written.
+    """
+    global _source_id, _synced_bytes
+    stat = SOURCE_FILE.stat()
+    source_id = (stat.st_dev, stat.st_ino)
+
+    if _source_id is None:
+        offset = load_offset(source_id, stat.st_size)
+        if offset is None or not dest.exists():
+            return backfill_mirror(dest, stat)
+        _source_id = source_id
+        _synced_bytes = offset
+
+    if source_id != _source_id or stat.st_size < _synced_bytes or not dest.exists():
+        return backfill_mirror(dest, stat)
+
+    with open(SOURCE_FILE, "rb") as src, open(dest, "ab") as out:
+        src.seek(_synced_bytes)
+        tail = src.read(stat.st_size - _synced_bytes)
+        out.write(tail)
+    if tail:
+        _synced_bytes += len(tail)
+        save_offset()
+    return len(tail)
+
+def rotate_mirror(dest):
+    """Seal an oversized repo copy as a timestamped file and start an empty one.
+
+    The source offset is kept, so the fresh copy continues with new lines only.
+    """
+    if not dest.exists() or dest.stat().st_size < MIRROR_MAX_BYTES:
+        return
+    rotated = dest.with_name(f"{dest.stem}.{int(time.time())}{dest.suffix}")
+    dest.replace(rotated)
+    dest.touch()
+    print(f"Rotated metrics mirror to {rotated.name}")
+
+    rotated_files = sorted(dest.parent.glob(f"{dest.stem}.*{dest.suffix}"))
+    for old_rotated in rotated_files[:-MAX_ROTATED]:
+        old_rotated.unlink()
+        print(f"Removed old rotated metrics: {old_rotated.name}")
+
 def sync_metrics():
     """Copy metrics and push to GitHub."""
+    global _cycle
     if not SOURCE_FILE.exists():
         print(f"Warning: {SOURCE_FILE} not found, skipping...")
         return
 
-    # Copy current metrics
+    # Mirror new metrics into the repo copy
     dest = REPO_DIR / "parallel_training_metrics.jsonl"
-    shutil.copy2(SOURCE_FILE, dest)
+    rotate_mirror(dest)
+    if mirror_metrics(dest) == 0:
+        # Source unchanged since last cycle: skip snapshot and git entirely
+        print(f"○ No changes at {time.strftime('%H:%M:%S')}")
+        return
 
-    # Create timestamped snapshot
+    # Create timestamped snapshot every SNAPSHOT_EVERY cycles. Snapshots must
+    # stay frozen while dest keeps growing in place, so they are real copies
+    # (a hardlink would share dest's inode and keep changing)
     timestamp = int(time.time())
-    snapshot = REPO_DIR / f"snapshots" / f"metrics_{timestamp}.jsonl"
-    snapshot.parent.mkdir(exist_ok=True)
-    shutil.copy2(SOURCE_FILE, snapshot)
-
-    # Clean old snapshots (keep last MAX_SNAPSHOTS)
-    snapshots = sorted(snapshot.parent.glob("metrics_*.jsonl"))
-    for old_snapshot in snapshots[:-MAX_SNAPSHOTS]:
-        old_snapshot.unlink()
-        print(f"Removed old snapshot: {old_snapshot.name}")
-
-    # Git add, commit, push
-    subprocess.run(["git", "add", "-A"], cwd=REPO_DIR, check=True)
-
-    # Check if there are changes
-    result = subprocess.run(["git", "diff", "--cached", "--quiet"], cwd=REPO_DIR)
-    if result.returncode != 0:  # Changes exist
-        subprocess.run([
-            "git", "commit", "-m",
-            f"Update metrics: {timestamp}"
-        ], cwd=REPO_DIR, check=True)
-        subprocess.run(["git", "push"], cwd=REPO_DIR, check=True)
+    if _cycle % SNAPSHOT_EVERY == 0:
+        snapshot = REPO_DIR / f"snapshots" / f"metrics_{timestamp}.jsonl"
+        snapshot.parent.mkdir(exist_ok=True)
+        shutil.copyfile(dest, snapshot)
+
+        # Clean old snapshots (keep last MAX_SNAPSHOTS)
+        snapshots = sorted(snapshot.parent.glob("metrics_*.jsonl"))
+        for old_snapshot in snapshots[:-MAX_SNAPSHOTS]:
+            old_snapshot.unlink()
+            print(f"Removed old snapshot: {old_snapshot.name}")
+    _cycle += 1
+
+    # Git add, commit, push. Stage only the paths this script writes (including
+    # pruned snapshots) so git doesn't rescan the whole worktree every cycle
+    subprocess.run(["git", "add", "-A", "--", f"{dest.stem}*{dest.suffix}", "snapshots"], cwd=REPO_DIR, check=True)
+
+    # Let commit's exit status report whether anything was staged instead of
+    # spawning a separate `git diff --cached --quiet` every cycle
+    result = subprocess.run([
+        "git", "commit", "-q", "-m",
+        f"Update metrics: {timestamp}"
+    ], cwd=REPO_DIR, capture_output=True, text=True)
+    if result.returncode == 0:
+        subprocess.run(["git", "push", "-q"], cwd=REPO_DIR, check=True)
         print(f"✓ Pushed update at {time.strftime('%H:%M:%S')}")
-    else:
+    elif result.returncode == 1:  # nothing staged
         print(f"○ No changes at {time.strftime('%H:%M:%S')}")
+    else:
+        raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, result.stderr)
 
 def main():
     print("=== CTM Monitor Sync ===")
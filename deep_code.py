@@ -17,8 +17,21 @@ def load_env():
                 k, v = line.split("=", 1)
                 os.environ[k.strip()] = v.strip()
 
+_GCP_CREDS = None
+
 def get_gcp_token():
-    """Fetch access token from gcloud CLI."""
+    """Fetch access token via in-process ADC (cached, auto-refreshing), falling back to gcloud CLI."""
+    global _GCP_CREDS
+    try:
+        import google.auth
+        from google.auth.transport.requests import Request
+        if _GCP_CREDS is None:
+            _GCP_CREDS, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
+        if not _GCP_CREDS.valid:
+            _GCP_CREDS.refresh(Request())
+        return _GCP_CREDS.token
+    except Exception:
+        pass
     try:
         result = subprocess.run("gcloud auth print-access-token", shell=True, capture_output=True, text=True, check=True)
         return result.stdout.strip()
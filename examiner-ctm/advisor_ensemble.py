@@ -5,7 +5,15 @@ Uses local .env.local for API keys (gitignored).
 """
 import os
 import json
+import time
+import hashlib
+import random
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import timezone
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
 # Load local config
@@ -29,6 +37,70 @@ GCP_LOCATION = CONFIG.get("GCP_LOCATION", "us-central1")
 GCP_QWEN_MODEL = CONFIG.get("GCP_QWEN_MODEL", "")
 GCP_LLAMA_ENDPOINT = CONFIG.get("GCP_LLAMA_ENDPOINT", "") # e.g. us-central1-aiplatform.googleapis.com
 
+# Shared HTTP session: keeps TCP+TLS connections alive across advisor calls
+# instead of a fresh handshake per requests.post
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+# Transient failures (timeouts, 429, 5xx) are retried with jittered exponential
+# backoff; other 4xx are terminal. Per-provider semaphores keep concurrent
+# requests under provider rate tiers when several ensembles overlap. Every
+# advisor of an ensemble runs at once, so each cap admits all of a provider's
+# advisors from one ensemble plus headroom; the GCP models have separate Vertex
+# quotas, so each gets its own slots rather than queueing behind one another.
+# A slot wait is bounded by the ensemble's hard deadline and fails the call, so
+# hung requests holding every slot surface as failures to the circuit breaker.
+ADVISOR_MAX_ATTEMPTS = 3
+ADVISOR_BACKOFF_BASE = 1.0  # seconds
+ADVISOR_BACKOFF_MAX = 10.0  # seconds
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504, 524}
+_provider_slots = {
+    "openrouter": threading.BoundedSemaphore(4),  # 3 OpenRouter advisors per ensemble
+    "gcp_qwen": threading.BoundedSemaphore(2),
+    "gcp_llama": threading.BoundedSemaphore(2),
+    "gcp_claude": threading.BoundedSemaphore(2),
+}
+
+@contextmanager
+def _provider_slot(provider: str):
+    """Hold one of provider's concurrency slots, waiting at most ENSEMBLE_HARD_DEADLINE."""
+    slots = _provider_slots[provider]
+    if not slots.acquire(timeout=ENSEMBLE_HARD_DEADLINE):
+        raise TimeoutError(f"no free {provider} slot after {ENSEMBLE_HARD_DEADLINE:.0f}s")
+    try:
+        yield
+    finally:
+        slots.release()
+
+def _backoff_delay(attempt: int, retry_after: str = None) -> float:
+    """Jittered exponential backoff, or the server's Retry-After when it sent one."""
+    if retry_after and retry_after.isdigit():
+        return min(ADVISOR_BACKOFF_MAX, float(retry_after))
+    return min(ADVISOR_BACKOFF_MAX, ADVISOR_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+def _post_with_retry(provider: str, url: str, headers: dict, payload: dict, timeout: float,
+                     stream: bool = False, read=None):
+    """POST via the shared session with bounded concurrency and retry on transient errors.
+
+    If read is given it consumes the response inside the provider slot and its
+    result is returned, so a streamed body counts against the cap until fully read.
+    """
+    for attempt in range(ADVISOR_MAX_ATTEMPTS):
+        last_attempt = attempt == ADVISOR_MAX_ATTEMPTS - 1
+        retry_after = None
+        try:
+            with _provider_slot(provider):
+                resp = _session.post(url, headers=headers, json=payload, timeout=timeout, stream=stream)
+                if resp.status_code not in _RETRYABLE_STATUS or last_attempt:
+                    resp.raise_for_status()
+                    return read(resp) if read else resp
+                retry_after = resp.headers.get("Retry-After")
+                resp.close()
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            if last_attempt:
+                raise
+        time.sleep(_backoff_delay(attempt, retry_after))
+
 # Default ensemble: Latest SOTA models from OpenRouter + GCP Vertex
 ENSEMBLE_MODELS = [
     ("openrouter", "qwen/qwen3-235b-a22b-2507"), # Qwen 3 (Latest)
@@ -39,43 +111,89 @@ ENSEMBLE_MODELS = [
     ("gcp_claude", "claude-opus-4-5@20251101"), # New Vertex AI model
 ]
 
+def _read_sse_content(resp) -> str:
+    """Accumulate delta content from an OpenAI-compatible SSE chat stream."""
+    parts = []
+    with resp:
+        for line in resp.iter_lines(decode_unicode=True):
+            # Skip keep-alive blanks and ': PROCESSING' comment lines
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if chunk.get("error"):
+                raise RuntimeError(chunk["error"])
+            choices = chunk.get("choices") or []
+            if choices:
+                parts.append(choices[0].get("delta", {}).get("content") or "")
+    return "".join(parts)
+
+# OpenRouter headers depend only on module config, so build them once
+_OPENROUTER_HEADERS = {
+    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+    "Content-Type": "application/json",
+    "HTTP-Referer": "https://github.com/humanaiconvention/examiner",
+    "X-Title": "Examiner-CTM"
+}
+
 def query_openrouter(model: str, prompt: str) -> dict:
     """Query via OpenRouter."""
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://github.com/humanaiconvention/examiner",
-        "X-Title": "Examiner-CTM"
-    }
     payload = {
         "model": model,
         "messages": [{"role": "user", "content": prompt}],
         "max_tokens": 200,
-        "temperature": 0.3
+        "temperature": 0.3,
+        # Stream so bytes keep flowing through Cloudflare's 100 s edge limit (524s);
+        # the timeout then bounds each gap between chunks, not the whole generation
+        "stream": True
     }
     try:
-        resp = requests.post(OPENROUTER_BASE, headers=headers, json=payload, timeout=30)
-        resp.raise_for_status()
-        return {"model": model, "trace": resp.json()["choices"][0]["message"]["content"], "success": True}
+        trace = _post_with_retry("openrouter", OPENROUTER_BASE, _OPENROUTER_HEADERS, payload,
+                                 timeout=30, stream=True, read=_read_sse_content)
+        return {"model": model, "trace": trace, "success": True}
     except Exception as e:
         return {"model": model, "trace": None, "success": False, "error": str(e)}
 
+# Cached GCP bearer token: refreshed only when within GCP_TOKEN_REFRESH_MARGIN
+# of expiry instead of a metadata/OAuth round-trip on every advisor call
+GCP_TOKEN_REFRESH_MARGIN = 60.0  # seconds
+GCLOUD_TOKEN_TTL = 3000.0  # seconds; gcloud tokens last ~1 h and report no expiry
+_gcp_creds = None
+_gcp_token = None
+_gcp_token_exp = 0.0
+_gcp_auth_lock = threading.Lock()
+
 def _get_gcp_auth():
-    import google.auth
-    from google.auth.transport.requests import Request
-    try:
-        creds, _ = google.auth.default()
-        creds.refresh(Request())
-        return creds.token
-    except Exception:
-        # Fallback to gcloud if available (common for local dev)
+    global _gcp_creds, _gcp_token, _gcp_token_exp
+    with _gcp_auth_lock:
+        if _gcp_token and time.time() < _gcp_token_exp - GCP_TOKEN_REFRESH_MARGIN:
+            return _gcp_token
         try:
-            import subprocess
-            # Use shell=True for .CMD files on Windows
-            result = subprocess.run("gcloud auth print-access-token", shell=True, capture_output=True, text=True, check=True)
-            return result.stdout.strip()
+            import google.auth
+            from google.auth.transport.requests import Request
+            if _gcp_creds is None:
+                _gcp_creds, _ = google.auth.default()
+            _gcp_creds.refresh(Request())
+            _gcp_token = _gcp_creds.token
+            if _gcp_creds.expiry:
+                # google-auth reports expiry as naive UTC
+                _gcp_token_exp = _gcp_creds.expiry.replace(tzinfo=timezone.utc).timestamp()
+            else:
+                _gcp_token_exp = time.time() + GCLOUD_TOKEN_TTL
+            return _gcp_token
         except Exception:
-            raise Exception("GCP credentials not found. Try 'gcloud auth application-default login'")
+            # Fallback to gcloud if available (common for local dev)
+            try:
+                import subprocess
+                # Use shell=True for .CMD files on Windows
+                result = subprocess.run("gcloud auth print-access-token", shell=True, capture_output=True, text=True, check=True)
+                _gcp_token = result.stdout.strip()
+                _gcp_token_exp = time.time() + GCLOUD_TOKEN_TTL
+                return _gcp_token
+            except Exception:
+                raise Exception("GCP credentials not found. Try 'gcloud auth application-default login'")
 
 def query_gcp_qwen(prompt: str) -> dict:
     """Query Qwen3-next-80B via GCP Vertex AI MaaS (Predict API)."""
@@ -88,8 +206,7 @@ def query_gcp_qwen(prompt: str) -> dict:
         headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
         payload = {"instances": [{"prompt": prompt}], "parameters": {"maxOutputTokens": 200, "temperature": 0.3}}
         
-        resp = requests.post(endpoint, headers=headers, json=payload, timeout=60)
-        resp.raise_for_status()
+        resp = _post_with_retry("gcp_qwen", endpoint, headers, payload, timeout=60)
         trace = resp.json()["predictions"][0]
         return {"model": "gcp-qwen3-80b", "trace": trace, "success": True}
     except Exception as e:
@@ -110,27 +227,60 @@ def query_gcp_llama4(model: str, prompt: str) -> dict:
             "messages": [{"role": "user", "content": prompt}],
             "max_tokens": 200,
             "temperature": 0.3,
-            "stream": False # Set to false for ensemble aggregation
+            "stream": True # Chunks are re-assembled before ensemble aggregation
         }
         
-        resp = requests.post(url, headers=headers, json=payload, timeout=60)
-        resp.raise_for_status()
-        trace = resp.json()["choices"][0]["message"]["content"]
+        trace = _post_with_retry("gcp_llama", url, headers, payload, timeout=60, stream=True, read=_read_sse_content)
         return {"model": model, "trace": trace, "success": True}
     except Exception as e:
         return {"model": model, "trace": None, "success": False, "error": str(e)}
 
+_vertex_client = None
+_vertex_client_token = None
+_vertex_client_lock = threading.Lock()
+
+def _get_vertex_client(token: str):
+    """Reuse one AnthropicVertex client (and its connection pool) until the access token changes."""
+    global _vertex_client, _vertex_client_token
+    with _vertex_client_lock:
+        if _vertex_client is None or token != _vertex_client_token:
+            from anthropic import AnthropicVertex
+            # Explicit timeout instead of the SDK's 600 s default; retries are
+            # left to _create_with_retry so they share the slot/backoff policy
+            _vertex_client = AnthropicVertex(region=GCP_LOCATION, project_id=GCP_PROJECT, access_token=token,
+                                             timeout=60, max_retries=0)
+            _vertex_client_token = token
+        return _vertex_client
+
+def _create_with_retry(client, **kwargs):
+    """messages.create under the gcp_claude slot, retried like _post_with_retry."""
+    import anthropic
+    for attempt in range(ADVISOR_MAX_ATTEMPTS):
+        last_attempt = attempt == ADVISOR_MAX_ATTEMPTS - 1
+        retry_after = None
+        try:
+            with _provider_slot("gcp_claude"):
+                return client.messages.create(**kwargs)
+        except anthropic.APIStatusError as e:
+            if e.status_code not in _RETRYABLE_STATUS or last_attempt:
+                raise
+            retry_after = e.response.headers.get("Retry-After")
+        except anthropic.APIConnectionError:  # includes APITimeoutError
+            if last_attempt:
+                raise
+        time.sleep(_backoff_delay(attempt, retry_after))
+
 def query_gcp_claude(model: str, prompt: str) -> dict:
     """Query Anthropic Claude via GCP Vertex AI library."""
     if not GCP_PROJECT:
         return {"model": model, "trace": None, "success": False, "error": "GCP Project not configured"}
         
     try:
-        from anthropic import AnthropicVertex
         # Pass access_token from gcloud/ADC fallback
         token = _get_gcp_auth()
-        client = AnthropicVertex(region=GCP_LOCATION, project_id=GCP_PROJECT, access_token=token)
-        message = client.messages.create(
+        client = _get_vertex_client(token)
+        message = _create_with_retry(
+            client,
             max_tokens=200,
             messages=[{"role": "user", "content": prompt}],
             model=model,
@@ -141,17 +291,108 @@ def query_gcp_claude(model: str, prompt: str) -> dict:
     except Exception as e:
         return {"model": model, "trace": None, "success": False, "error": str(e)}
 
+# provider -> fn(model, prompt); a single place to attach per-provider middleware
+_PROVIDERS = {
+    "openrouter": query_openrouter,
+    "gcp_qwen": lambda model, prompt: query_gcp_qwen(prompt),
+    "gcp_llama": query_gcp_llama4,
+    "gcp_claude": query_gcp_claude,
+}
+
+# Circuit breaker per (provider, model): after BREAKER_FAIL_MAX consecutive
+# failures the advisor is skipped for BREAKER_RESET_TIMEOUT seconds instead of
+# burning its full timeout on every ensemble; then one trial call is let through.
+BREAKER_FAIL_MAX = 3
+BREAKER_RESET_TIMEOUT = 60.0  # seconds
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call."""
+
+    def __init__(self, fail_max: int = BREAKER_FAIL_MAX, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.time() - self.opened_at >= self.reset_timeout:
+                self.opened_at = time.time()  # half-open: re-arm so only this call goes through
+                return True
+            return False
+
+    def record(self, success: bool, error: str = None):
+        with self._lock:
+            if success:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                self.last_error = error
+                if self.failures >= self.fail_max:
+                    self.opened_at = time.time()
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def _get_breaker(provider: str, model: str) -> CircuitBreaker:
+    with _breakers_lock:
+        return _breakers.setdefault((provider, model), CircuitBreaker())
+
 def query_single_advisor(provider: str, model: str, prompt: str) -> dict:
     """Route to correct provider."""
-    if provider == "gcp_qwen":
-        return query_gcp_qwen(prompt)
-    if provider == "gcp_llama":
-        return query_gcp_llama4(model, prompt)
-    if provider == "gcp_claude":
-        return query_gcp_claude(model, prompt)
-    return query_openrouter(model, prompt)
+    breaker = _get_breaker(provider, model)
+    if not breaker.allow():
+        return {"model": model, "trace": None, "success": False,
+                "error": f"circuit open (last error: {breaker.last_error})"}
+
+    result = _PROVIDERS.get(provider, query_openrouter)(model, prompt)
+    breaker.record(result["success"], result.get("error"))
+    return result
 
 
+# Early return: once QUORUM advisors have succeeded and the soft deadline has
+# passed, stop waiting on stragglers. The hard deadline stays under the
+# GroundingClient's 65 s recv timeout so a hung provider can't stall the ensemble.
+ENSEMBLE_QUORUM = 3
+ENSEMBLE_SOFT_DEADLINE = 4.0  # seconds
+ENSEMBLE_HARD_DEADLINE = 55.0  # seconds
+
+def _advisor_label(provider: str, model: str) -> str:
+    model_name = model.split('/')[-1] if '/' in model else model
+    return f"{provider.upper()}:{model_name}"
+
+# Exact-match response cache: identical prompts issued by the auto-grounding
+# loop within the TTL reuse the previous consensus instead of re-billing all
+# advisors. Only results with at least ENSEMBLE_QUORUM successes are cached.
+ENSEMBLE_CACHE_TTL = 3600.0  # seconds
+ENSEMBLE_CACHE_MAX = 2048
+_ensemble_cache = OrderedDict()  # sha256(prompt) -> (expires_at, result)
+_ensemble_cache_lock = threading.Lock()
+
+def _cache_get(key: str):
+    with _ensemble_cache_lock:
+        entry = _ensemble_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.time() >= expires_at:
+            del _ensemble_cache[key]
+            return None
+        _ensemble_cache.move_to_end(key)
+        return result
+
+def _cache_put(key: str, result: dict):
+    with _ensemble_cache_lock:
+        _ensemble_cache[key] = (time.time() + ENSEMBLE_CACHE_TTL, result)
+        _ensemble_cache.move_to_end(key)
+        while len(_ensemble_cache) > ENSEMBLE_CACHE_MAX:
+            _ensemble_cache.popitem(last=False)
+
 def query_ensemble(query: str, logic_gap: str, pillar: str) -> dict:
     """Query SOTA models, aggregate into A/B Consilience Trace."""
     
@@ -169,23 +410,52 @@ TASK:
 
 OUTPUT: Pure causal reasoning. No conversational filler."""
 
-    from concurrent.futures import ThreadPoolExecutor
+    cache_key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        print(f"  [Ensemble Cache] HIT for {pillar}")
+        return cached
+
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
     
-    results_list = []
     def run_query(m_info):
         provider, model = m_info
         result = query_single_advisor(provider, model, prompt)
-        model_name = model.split('/')[-1] if '/' in model else model
-        result["label"] = f"{provider.upper()}:{model_name}"
+        result["label"] = _advisor_label(provider, model)
         return result
 
-    with ThreadPoolExecutor(max_workers=len(ENSEMBLE_MODELS)) as executor:
-        results_list = list(executor.map(run_query, ENSEMBLE_MODELS))
+    # Collect advisors as they finish instead of blocking on the slowest one
+    executor = ThreadPoolExecutor(max_workers=len(ENSEMBLE_MODELS))
+    futures = {executor.submit(run_query, m_info): i for i, m_info in enumerate(ENSEMBLE_MODELS)}
+    pending = set(futures)
+    completed = {}
+    start = time.time()
+    try:
+        while pending:
+            elapsed = time.time() - start
+            success_count = sum(1 for r in completed.values() if r["success"])
+            if success_count >= ENSEMBLE_QUORUM:
+                timeout = ENSEMBLE_SOFT_DEADLINE - elapsed
+            else:
+                timeout = ENSEMBLE_HARD_DEADLINE - elapsed
+            if timeout <= 0:
+                break
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for f in done:
+                completed[futures[f]] = f.result()
+    finally:
+        # Don't join stragglers; their results are discarded when they finish
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # Keep ENSEMBLE_MODELS order so trace labels stay stable across calls
+    results_list = [completed[i] for i in sorted(completed)]
     
     for r in results_list:
         print(f"  [{r['label']}] {'PASS' if r['success'] else 'FAIL'}")
         if not r["success"]:
             print(f"    Error: {r.get('error', 'Unknown Error')}")
+    for f in sorted(pending, key=futures.get):
+        print(f"  [{_advisor_label(*ENSEMBLE_MODELS[futures[f]])}] SKIPPED (deadline)")
     
     # Construct Consilience Trace (A/B/C/D/E)
     traces = []
@@ -199,12 +469,17 @@ OUTPUT: Pure causal reasoning. No conversational filler."""
     consensus = "\n\n".join(traces)
     success_count = sum(1 for r in results_list if r["success"])
     
-    return {
+    result = {
         "consensus": consensus,
         "counter_weights": [], # Embedded in consensus
         "confidence": success_count / len(ENSEMBLE_MODELS),
         "raw_results": results_list
     }
+    # A result below quorum (e.g. a transient provider outage) would pin a
+    # low-confidence override for the whole TTL; let the next call retry instead
+    if success_count >= ENSEMBLE_QUORUM:
+        _cache_put(cache_key, result)
+    return result
 
 
 if __name__ == "__main__":
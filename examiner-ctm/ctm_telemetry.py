@@ -1,80 +1,301 @@
 import os
+import sys
 import json
+import queue
+import atexit
+import logging
+import logging.handlers
 import time
 import subprocess
 import asyncio
 import threading
+from collections import deque
 try:
     import websockets
     HAS_WEBSOCKETS = True
 except ImportError:
     HAS_WEBSOCKETS = False
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:  # not available on Windows
+    HAS_UVLOOP = False
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+try:
+    import pynvml
+    HAS_NVML = True
+except ImportError:
+    HAS_NVML = False
 from datetime import datetime
 
+logger = logging.getLogger("ctm.telemetry")
+_log_listener = None
+
+def _setup_logging():
+    """Print telemetry log lines from a listener thread, so the sidecar loop never blocks on stdout"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("  [Telemetry] %(message)s"))
+    _log_listener = logging.handlers.QueueListener(log_queue, console)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)  # flushes anything still queued
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# orjson options: numpy scalars/arrays pass through, int keys in 'extra' stringify like stdlib json
+_ORJSON_OPTS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if HAS_ORJSON else 0
+
+def _json_default(obj):
+    """Serialize numpy arrays/scalars orjson can't take natively, and all of them under stdlib json"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps(payload):
+    """Serialize a payload to a JSON str (orjson when available, else stdlib json)"""
+    if HAS_ORJSON:
+        return orjson.dumps(payload, default=_json_default, option=_ORJSON_OPTS).decode("utf-8")
+    return json.dumps(payload, default=_json_default)
+
+def _packb(payload):
+    """Serialize a payload to msgpack bytes (sent as a binary frame)"""
+    return msgpack.packb(payload, default=_json_default, use_bin_type=True)
+
+SNAPSHOT_FILE = "ctm_telemetry_snapshot.json"
+MIB = 1024 * 1024
+NVIDIA_SMI_CMD = ("nvidia-smi", "--id=0",
+                  "--query-gpu=utilization.gpu,memory.used,memory.total,temperature.gpu,power.draw",
+                  "--format=csv,noheader,nounits")
+# NVML GPM metrics (Hopper and newer) added to the GPU stats: (stats key, pynvml metric id name)
+GPM_METRICS = (
+    ("sm_active_pct", "NVML_GPM_METRIC_SM_UTIL"),
+    ("sm_occupancy_pct", "NVML_GPM_METRIC_SM_OCCUPANCY"),
+    ("tensor_active_pct", "NVML_GPM_METRIC_ANY_TENSOR_UTIL"),
+    ("dram_bw_pct", "NVML_GPM_METRIC_DRAM_BW_UTIL"),
+    ("pcie_tx_mibps", "NVML_GPM_METRIC_PCIE_TX_PER_SEC"),
+    ("pcie_rx_mibps", "NVML_GPM_METRIC_PCIE_RX_PER_SEC"),
+)
+GPU_STATS_TTL = 0.1  # seconds; NVML power/utilization don't refresh faster than this
+GPU_SMI_INTERVAL = 2.0  # seconds; each nvidia-smi sample is a fork+exec, keep it rare
+GPU_POLL_BACKOFF = 30.0  # seconds between retries while no GPU stats are available
+PENDING_MAX = 4096  # payloads buffered for the dashboard; oldest dropped beyond this
+# AI Studio TelemetryData shape; push_metrics copies this and fills in the step's values.
+# The shared empty sync_sample/extra defaults are never mutated
+_METRICS_SKELETON = {
+    "type": "metrics",
+    "iteration": 0,
+    "cycle": 0,
+    "loss": 0.0,
+    "vram": 0,
+    "thought_delta": 0.0,
+    "pillar": "LOGOS",
+    "drift": 0.0,
+    "epsilon": 0.0,
+    "sync_sample": [],
+    "extra": {},
+    "timestamp": 0.0
+}
+BATCH_SUBPROTOCOL = "ctm.batch.v1"  # clients offering this get one JSON frame per wakeup
+MSGPACK_SUBPROTOCOL = "ctm.msgpack.v1"  # same batching, msgpack binary frames (needs msgpack)
+
+SUBPROTOCOLS = ([MSGPACK_SUBPROTOCOL] if HAS_MSGPACK else []) + [BATCH_SUBPROTOCOL]
+
+def _select_subprotocol(first, second):
+    """Opt-in batching/msgpack; clients offering no subprotocol keep one JSON frame per payload.
+
+    websockets >= 14 calls this as (connection, offered); the legacy server that
+    websockets.serve still is on 11-13 calls it as (offered, server_subprotocols).
+    """
+    offered = first if isinstance(first, (list, tuple)) else second
+    for subprotocol in SUBPROTOCOLS:
+        if subprotocol in offered:
+            return subprotocol
+    return None
+
 class CTMTelemetry:
-    def __init__(self, log_file="parallel_training_metrics.jsonl", port=8080):
+    def __init__(self, log_file="parallel_training_metrics.jsonl", port=8080, loop=None):
         self.log_file = log_file
         self.port = port
-        self.queue = asyncio.Queue()
+        # Training thread appends, sidecar loop drains; _waiter parks idle clients
+        self._pending = deque(maxlen=PENDING_MAX)
+        self._waiter = None
+        self._wake_pending = False
+        self._client_count = 0
         self.loop = None
-        self._start_sidecar()
+        self._nvml_handle = None
+        self._mem_total_mb = None
+        self._gpu_cache = None
+        self._gpu_ts = float("-inf")
+        self._gpm_samples = None  # [previous, scratch] GPM sample buffers
+        self._gpm_request = None
+        self._gpm_primed = False
+        self._gpm_lock = threading.Lock()
+        _setup_logging()
+        self._init_nvml()
+        if loop is not None:
+            # Host app already runs a loop: serve from it instead of a private thread
+            self.loop = loop
+            loop.call_soon_threadsafe(self._start_sidecar_task)
+        else:
+            self._start_sidecar()
+
+    def _init_nvml(self):
+        """Open the NVML handle for GPU 0 once; without it get_gpu_stats falls back to nvidia-smi"""
+        if not HAS_NVML:
+            return
+        try:
+            pynvml.nvmlInit()
+            self._nvml_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            # Total memory never changes, read it once
+            self._mem_total_mb = pynvml.nvmlDeviceGetMemoryInfo(self._nvml_handle).total // MIB
+            atexit.register(pynvml.nvmlShutdown)
+        except pynvml.NVMLError as e:
+            self._nvml_handle = None
+            logger.info("NVML unavailable (%s), using nvidia-smi.", e)
+            return
+        self._init_gpm()
+
+    def _init_gpm(self):
+        """Allocate GPM sample buffers and the metrics request once, if the GPU supports GPM"""
+        try:
+            if not pynvml.nvmlGpmQueryDeviceSupport(self._nvml_handle).isSupportedDevice:
+                return
+            request = pynvml.c_nvmlGpmMetricsGet_t()
+            request.version = pynvml.NVML_GPM_METRICS_GET_VERSION
+            request.numMetrics = len(GPM_METRICS)
+            for i, (_, metric_name) in enumerate(GPM_METRICS):
+                request.metrics[i].metricId = getattr(pynvml, metric_name)
+            samples = [pynvml.nvmlGpmSampleAlloc(), pynvml.nvmlGpmSampleAlloc()]
+        except (AttributeError, pynvml.NVMLError):
+            # Pre-Hopper GPU, or bindings/driver without GPM: basic device queries only
+            return
+        for sample in samples:
+            atexit.register(pynvml.nvmlGpmSampleFree, sample)  # runs before nvmlShutdown
+        self._gpm_request = request
+        self._gpm_samples = samples
 
     def _start_sidecar(self):
         """Start the WebSocket sidecar in a background thread"""
         def run_server():
-            self.loop = asyncio.new_event_loop()
+            # uvloop only for the sidecar's own loop; the global policy is left alone
+            self.loop = uvloop.new_event_loop() if HAS_UVLOOP else asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
             self.loop.run_until_complete(self.telemetry_sidecar())
 
         thread = threading.Thread(target=run_server, daemon=True)
         thread.start()
 
+    def _start_sidecar_task(self):
+        """Run the sidecar on a caller-provided loop (keeps a strong ref to the task)"""
+        self._sidecar_task = self.loop.create_task(self.telemetry_sidecar())
+
     async def telemetry_sidecar(self):
         """Serve metrics via WebSocket for AI Studio alignment"""
         if not HAS_WEBSOCKETS:
-            print("  [Telemetry] Sidecar disabled (websockets not found).")
+            logger.warning("Sidecar disabled (websockets not found).")
             return
-        print(f"  [Telemetry] Sidecar starting on ws://0.0.0.0:{self.port}...")
-        async with websockets.serve(self.handle_client, "0.0.0.0", self.port):
+        logger.info("Sidecar starting on ws://0.0.0.0:%d...", self.port)
+        self._clients_present = asyncio.Event()
+        self._gpu_task = asyncio.create_task(self._gpu_poller())
+        # compression=None: permessage-deflate costs CPU on every small metrics frame
+        # subprotocols= too: the legacy server only consults the selector when it is set
+        async with websockets.serve(self.handle_client, "0.0.0.0", self.port,
+                                    subprotocols=SUBPROTOCOLS,
+                                    select_subprotocol=_select_subprotocol,
+                                    compression=None):
             await asyncio.Future()  # run forever
 
+    async def _gpu_poller(self):
+        """Keep the GPU sample fresh from the sidecar so push_metrics never blocks on it"""
+        while True:
+            # Headless runs: nobody sees vram, so don't sample until a dashboard connects
+            await self._clients_present.wait()
+            # to_thread: the nvidia-smi fallback would otherwise stall the sidecar loop
+            sample = await asyncio.to_thread(self._sample_gpu)
+            self._gpu_cache, self._gpu_ts = sample, time.monotonic()
+            await asyncio.sleep(self._gpu_interval() if sample is not None else GPU_POLL_BACKOFF)
+
+    def _gpu_interval(self):
+        """Seconds a GPU sample stays fresh: NVML is cheap, the nvidia-smi fallback is not"""
+        return GPU_STATS_TTL if self._nvml_handle is not None else GPU_SMI_INTERVAL
+
     async def handle_client(self, websocket):
         """Send live metrics to connected AI Studio dashboard"""
-        print(f"  [Telemetry] AI Studio Monitor Connected.")
+        logger.info("AI Studio Monitor Connected.")
+        batched = websocket.subprotocol in (BATCH_SUBPROTOCOL, MSGPACK_SUBPROTOCOL)
+        encode = _packb if websocket.subprotocol == MSGPACK_SUBPROTOCOL else _dumps
+        self._client_count += 1
+        self._clients_present.set()
+        closed = asyncio.ensure_future(websocket.wait_closed())
         try:
-            while True:
-                # Wait for new metrics data
-                payload = await self.queue.get()
-                await websocket.send(json.dumps(payload))
+            while not closed.done():
+                while self._pending:
+                    if batched:
+                        # Coalesce everything queued since the last send into one frame
+                        items = [self._pending.popleft() for _ in range(len(self._pending))]
+                        await websocket.send(encode({"type": "batch", "items": items}))
+                    else:
+                        await websocket.send(encode(self._pending.popleft()))
+                # Wait for new metrics data, or the client going away so a dead
+                # connection doesn't wake up and swallow payloads. The waiter is
+                # shared so several dashboards can park on it
+                if self._waiter is None or self._waiter.done():
+                    self._waiter = self.loop.create_future()
+                await asyncio.wait((self._waiter, closed), return_when=asyncio.FIRST_COMPLETED)
+            logger.info("AI Studio Monitor Disconnected.")
         except Exception as e:
             if HAS_WEBSOCKETS and isinstance(e, websockets.exceptions.ConnectionClosed):
-                print(f"  [Telemetry] AI Studio Monitor Disconnected.")
+                logger.info("AI Studio Monitor Disconnected.")
             else:
-                print(f"  [Telemetry] Client error: {e}")
+                logger.warning("Client error: %s", e)
+        finally:
+            closed.cancel()
+            self._client_count -= 1
+            if not self._client_count:
+                self._clients_present.clear()
 
     def push_metrics(self, metrics):
-        """Push metrics from the synchronous training loop into the async sidecar"""
+        """Push metrics from the synchronous training loop into the async sidecar.
+
+        sync_sample may be a list or a numpy array (e.g. float32); arrays are
+        passed through as-is and serialized without boxing each element.
+        """
         if self.loop is None:
             return
 
-        # Prepare payload matching AI Studio TelemetryData interface
-        gpu = self.get_gpu_stats()
-        payload = {
-            "type": "metrics",
-            "iteration": metrics.get('step', 0),
-            "cycle": metrics.get('thinking_depth', 0), 
-            "loss": float(metrics.get('loss', 0.0)),
-            "vram": gpu['memory_used_mb'] if gpu else 0,
-            "thought_delta": float(metrics.get('reward', 0.0)),
-            "pillar": metrics.get('pillar', 'LOGOS'),
-            "drift": float(metrics.get('drift', 0.0)),
-            "epsilon": float(metrics.get('epsilon', 0.0)),
-            "sync_sample": metrics.get('sync_sample', []), 
-            "extra": metrics.get('extra', {}),
-            "timestamp": time.time() * 1000
-        }
+        # Prepare payload matching AI Studio TelemetryData interface.
+        # GPU stats come from the sidecar's poller (plain attribute read)
+        gpu = self._gpu_cache
+        payload = _METRICS_SKELETON.copy()
+        payload["iteration"] = metrics.get('step', 0)
+        payload["cycle"] = metrics.get('thinking_depth', 0)
+        payload["loss"] = float(metrics.get('loss', 0.0))
+        if gpu:
+            payload["vram"] = gpu['memory_used_mb']
+        payload["thought_delta"] = float(metrics.get('reward', 0.0))
+        payload["pillar"] = metrics.get('pillar', 'LOGOS')
+        payload["drift"] = float(metrics.get('drift', 0.0))
+        payload["epsilon"] = float(metrics.get('epsilon', 0.0))
+        if 'sync_sample' in metrics:
+            payload["sync_sample"] = metrics['sync_sample']
+        if 'extra' in metrics:
+            payload["extra"] = metrics['extra']
+        payload["timestamp"] = time.time() * 1000
         
-        self.loop.call_soon_threadsafe(self.queue.put_nowait, payload)
+        self._enqueue(payload)
 
     def push_readme(self, readme_content):
         """Push README content to AI Studio for display"""
@@ -87,14 +308,78 @@ class CTMTelemetry:
             "git_branch": "parallel-ctm-marathon",
             "timestamp": time.time() * 1000
         }
-        self.loop.call_soon_threadsafe(self.queue.put_nowait, payload)
+        self._enqueue(payload)
+
+    def _enqueue(self, payload):
+        """Hand a payload from the training thread to the sidecar loop"""
+        self._pending.append(payload)
+        # One scheduled wake covers every payload appended before it runs
+        if not self._wake_pending:
+            self._wake_pending = True
+            self.loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        """Release clients parked on the waiter (runs on the sidecar loop)"""
+        # Cleared before waking, so a push racing with the drain schedules a fresh wake
+        self._wake_pending = False
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _sample_gpm(self):
+        """GPM metrics over the interval since the previous sample ({} on the first call)"""
+        with self._gpm_lock:  # poller thread and save_snapshot share the buffers
+            prev, cur = self._gpm_samples
+            try:
+                pynvml.nvmlGpmSampleGet(self._nvml_handle, cur)
+            except pynvml.NVMLError:
+                return {}
+            # The newest sample becomes the baseline for the next interval
+            self._gpm_samples = [cur, prev]
+            if not self._gpm_primed:
+                self._gpm_primed = True
+                return {}
+            request = self._gpm_request
+            request.sample1, request.sample2 = prev, cur
+            try:
+                pynvml.nvmlGpmMetricsGet(request)
+            except pynvml.NVMLError:
+                return {}
+            return {
+                key: request.metrics[i].value
+                for i, (key, _) in enumerate(GPM_METRICS)
+                if request.metrics[i].nvmlReturn == pynvml.NVML_SUCCESS
+            }
 
     def get_gpu_stats(self):
-        """Get GPU utilization via nvidia-smi"""
+        """Get GPU stats, reusing the last sample while it is fresh (see _gpu_interval)"""
+        now = time.monotonic()
+        if now - self._gpu_ts < self._gpu_interval():
+            return self._gpu_cache
+        self._gpu_cache = self._sample_gpu()
+        self._gpu_ts = now
+        return self._gpu_cache
+
+    def _sample_gpu(self):
+        """Get GPU utilization via NVML (in-process), or nvidia-smi as a fallback"""
+        if self._nvml_handle is not None:
+            try:
+                h = self._nvml_handle
+                stats = {
+                    "utilization": float(pynvml.nvmlDeviceGetUtilizationRates(h).gpu),
+                    "memory_used_mb": pynvml.nvmlDeviceGetMemoryInfo(h).used // MIB,
+                    "memory_total_mb": self._mem_total_mb,
+                    "temperature_c": pynvml.nvmlDeviceGetTemperature(h, pynvml.NVML_TEMPERATURE_GPU),
+                    "power_draw_w": pynvml.nvmlDeviceGetPowerUsage(h) / 1000.0  # mW -> W
+                }
+            except pynvml.NVMLError:
+                return None
+            if self._gpm_samples is not None:
+                stats.update(self._sample_gpm())
+            return stats
         try:
-            cmd = "nvidia-smi --query-gpu=utilization.gpu,memory.used,memory.total,temperature.gpu,power.draw --format=csv,noheader,nounits"
-            output = subprocess.check_output(cmd.split()).decode("utf-8").strip()
-            gpu_util, mem_used, mem_total, temp, power = output.split(", ")
+            # int()/float() accept the ASCII fields as bytes, no decode needed
+            output = subprocess.check_output(NVIDIA_SMI_CMD).strip()
+            gpu_util, mem_used, mem_total, temp, power = output.split(b", ")
             return {
                 "utilization": float(gpu_util),
                 "memory_used_mb": int(mem_used),
@@ -117,6 +402,13 @@ class CTMTelemetry:
                 "training_step": step_info
             }
         }
-        with open("ctm_telemetry_snapshot.json", "w") as f:
-            json.dump(payload, f, indent=2)
+        if HAS_ORJSON:
+            data = orjson.dumps(payload, default=_json_default, option=_ORJSON_OPTS | orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(payload, indent=2, default=_json_default).encode("utf-8")
+        # Write aside and swap in, so readers never see a half-written snapshot
+        tmp_path = SNAPSHOT_FILE + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, SNAPSHOT_FILE)
         return payload
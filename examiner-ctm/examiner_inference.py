@@ -186,8 +186,8 @@ class ExaminerInference:
         # Clear activation buffer
         self.activation_buffer.clear()
 
-        # Generate
-        with torch.no_grad():
+        # Generate (inference_mode skips autograd version/view tracking entirely)
+        with torch.inference_mode():
             outputs = self.model.generate(
                 **inputs,
                 max_new_tokens=max_new_tokens,
@@ -22,6 +22,7 @@ import argparse
 import os
 import sys
 import subprocess
+from importlib.metadata import PackageNotFoundError, distribution
 from pathlib import Path
 from datetime import datetime
 
@@ -38,11 +39,14 @@ def check_requirements():
         'trl', 'sentence-transformers', 'scipy', 'tqdm', 'einops'
     ]
 
+    # Look up installed distribution metadata rather than importing each
+    # package: importing torch/transformers just to test presence costs
+    # seconds of startup and initializes CUDA before the trainer needs it.
     missing = []
     for pkg in required_packages:
         try:
-            __import__(pkg.replace('-', '_'))
-        except ImportError:
+            distribution(pkg)
+        except PackageNotFoundError:
             missing.append(pkg)
 
     if missing:
@@ -4,26 +4,38 @@ import os
 import sys
 from datetime import datetime
 
+METRICS_FILE = "parallel_training_metrics.jsonl"
+
+# remote -> refspec pushed on each heartbeat
+PUSH_TARGETS = {
+    "origin": "HEAD:live",
+    "website": "HEAD:live",
+    "private": "HEAD:parallel-ctm-marathon",
+}
+
 def push_metrics():
     """Commit and push metrics to git-sync."""
     try:
-        # 1. Add metrics
-        subprocess.run(["git", "add", "parallel_training_metrics.jsonl"], check=False)
-        
-        # 2. Commit
+        # 1. Commit with a pathspec: stages and commits the tracked metrics
+        # file in one git process, no separate `git add`
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         msg = f"CTM Heartbeat: {timestamp} | Syncing Logic Foundation Metrics"
-        subprocess.run(["git", "commit", "-m", msg], check=False)
+        subprocess.run(["git", "commit", "-q", "-m", msg, "--", METRICS_FILE], check=False)
         
-        # 3. Push to all remotes
-        remotes = ["origin", "website", "private"]
-        for remote in remotes:
+        # 2. Push to all remotes concurrently so one slow remote doesn't serialize the rest
+        # We assume current branch is the one we want to sync
+        pushes = {}
+        for remote, refspec in PUSH_TARGETS.items():
             print(f"[Git Sync] Pushing to {remote}...")
-            # Push the branch we are on to the corresponding branch on each remote
-            # We assume current branch is the one we want to sync
-            result = subprocess.run(["git", "push", remote, "HEAD:live" if remote != "private" else "HEAD:parallel-ctm-marathon", "--force"], capture_output=True, text=True)
-            if result.returncode != 0:
-                print(f"[Git Sync] Push to {remote} failed: {result.stderr}")
+            pushes[remote] = subprocess.Popen(
+                ["git", "push", remote, refspec, "--force"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+            )
+
+        for remote, proc in pushes.items():
+            _, stderr = proc.communicate()
+            if proc.returncode != 0:
+                print(f"[Git Sync] Push to {remote} failed: {stderr}")
             else:
                 print(f"[Git Sync] Pushed to {remote} successfully")
             
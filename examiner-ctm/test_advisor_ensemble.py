@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Unit Test for Advisor Ensemble
+
+Tests the per-advisor circuit breaker, the quorum early return and bounded
+provider slot waits with stub providers (no network calls).
+"""
+
+import sys
+import time
+import threading
+import advisor_ensemble
+from advisor_ensemble import CircuitBreaker, query_single_advisor, query_ensemble
+
+
+class StubProvider:
+    """Stub provider fn(model, prompt): fixed outcome after an optional delay."""
+
+    def __init__(self, success=True, delay=0.0):
+        self.success = success
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, model, prompt):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.success:
+            return {"model": model, "trace": f"trace from {model}", "success": True}
+        return {"model": model, "trace": None, "success": False, "error": "stub failure"}
+
+
+def test_breaker_opens_after_fail_max():
+    """Advisor is skipped without a call once BREAKER_FAIL_MAX consecutive failures hit."""
+    print("\n=== Test 1: Breaker Opens ===")
+
+    stub = StubProvider(success=False)
+    advisor_ensemble._PROVIDERS["stub_failing"] = stub
+    try:
+        for _ in range(advisor_ensemble.BREAKER_FAIL_MAX):
+            result = query_single_advisor("stub_failing", "m-open", "prompt")
+            assert not result["success"]
+        assert stub.calls == advisor_ensemble.BREAKER_FAIL_MAX
+
+        result = query_single_advisor("stub_failing", "m-open", "prompt")
+        assert stub.calls == advisor_ensemble.BREAKER_FAIL_MAX, "open breaker still called the provider"
+        assert "circuit open" in result["error"], f"unexpected error: {result['error']}"
+        assert "stub failure" in result["error"], "last error not reported"
+        print(f"  OK: open after {advisor_ensemble.BREAKER_FAIL_MAX} failures, provider not called")
+    finally:
+        del advisor_ensemble._PROVIDERS["stub_failing"]
+
+    print("PASS: Breaker opens after BREAKER_FAIL_MAX failures\n")
+
+
+def test_half_open_single_trial():
+    """After reset_timeout exactly one caller gets through, even under concurrency."""
+    print("\n=== Test 2: Half-Open Single Trial ===")
+
+    breaker = CircuitBreaker(fail_max=2, reset_timeout=0.05)
+    breaker.record(False, "e1")
+    assert breaker.allow(), "one failure must not open the breaker"
+    breaker.record(False, "e2")
+    assert not breaker.allow(), "breaker should be open"
+
+    time.sleep(0.06)
+    allowed = []
+    barrier = threading.Barrier(8)
+
+    def caller():
+        barrier.wait()
+        allowed.append(breaker.allow())
+
+    threads = [threading.Thread(target=caller) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert allowed.count(True) == 1, f"expected 1 trial call, got {allowed.count(True)}"
+    print("  OK: 1 of 8 concurrent callers let through")
+
+    # A failed trial re-opens for another full reset_timeout
+    breaker.record(False, "trial failed")
+    assert not breaker.allow(), "failed trial should re-open the breaker"
+    print("  OK: failed trial re-opens")
+
+    print("PASS: Half-open lets exactly one trial through\n")
+
+
+def test_success_closes_breaker():
+    """A successful trial closes the breaker and resets the failure count."""
+    print("\n=== Test 3: Success Closes ===")
+
+    breaker = CircuitBreaker(fail_max=2, reset_timeout=0.05)
+    breaker.record(False, "e1")
+    breaker.record(False, "e2")
+    time.sleep(0.06)
+    assert breaker.allow(), "trial call should be allowed"
+    breaker.record(True)
+    assert breaker.failures == 0 and breaker.opened_at is None
+    assert all(breaker.allow() for _ in range(5)), "closed breaker should allow every call"
+
+    breaker.record(False, "e3")
+    assert breaker.allow(), "a single failure after closing must not re-open"
+    print("  OK: closed, failure count reset")
+
+    print("PASS: Success closes the breaker\n")
+
+
+def test_quorum_early_return():
+    """Quorum + soft deadline returns without stragglers and keeps ENSEMBLE_MODELS order."""
+    print("\n=== Test 4: Quorum Early Return ===")
+
+    # Finish order (c, a, b) differs from model order (a, b, c); d/e are stragglers
+    stubs = {
+        "stub_a": StubProvider(delay=0.10),
+        "stub_b": StubProvider(delay=0.15),
+        "stub_c": StubProvider(delay=0.01),
+        "stub_d": StubProvider(delay=1.0),
+        "stub_e": StubProvider(delay=1.0),
+    }
+    saved = (advisor_ensemble.ENSEMBLE_MODELS, advisor_ensemble.ENSEMBLE_SOFT_DEADLINE)
+    advisor_ensemble._PROVIDERS.update(stubs)
+    advisor_ensemble.ENSEMBLE_MODELS = [(name, f"{name}-model") for name in stubs]
+    advisor_ensemble.ENSEMBLE_SOFT_DEADLINE = 0.3
+    try:
+        start = time.time()
+        result = query_ensemble(f"quorum test {time.time()}", "gap", "LOGOS")
+        elapsed = time.time() - start
+    finally:
+        advisor_ensemble.ENSEMBLE_MODELS, advisor_ensemble.ENSEMBLE_SOFT_DEADLINE = saved
+        for name in stubs:
+            del advisor_ensemble._PROVIDERS[name]
+
+    assert elapsed < 0.8, f"waited on stragglers ({elapsed:.2f}s)"
+    print(f"  OK: returned after {elapsed:.2f}s")
+
+    labels = [r["label"] for r in result["raw_results"]]
+    assert labels == ["STUB_A:stub_a-model", "STUB_B:stub_b-model", "STUB_C:stub_c-model"], labels
+    assert result["consensus"].index("stub_a-model") < result["consensus"].index("stub_c-model")
+    print(f"  OK: results in model order: {labels}")
+
+    assert result["confidence"] == 3 / 5, f"confidence {result['confidence']}"
+    print("  OK: confidence counts stragglers as missing (3/5)")
+
+    print("PASS: Quorum early return skips stragglers\n")
+
+
+def test_slot_wait_times_out():
+    """A provider whose slots are all held fails the call instead of blocking forever."""
+    print("\n=== Test 5: Slot Wait Timeout ===")
+
+    slots = advisor_ensemble._provider_slots["gcp_qwen"]
+    held = 0
+    while slots.acquire(blocking=False):
+        held += 1
+    saved = (advisor_ensemble.GCP_PROJECT, advisor_ensemble.GCP_QWEN_MODEL,
+             advisor_ensemble._get_gcp_auth, advisor_ensemble.ENSEMBLE_HARD_DEADLINE)
+    advisor_ensemble.GCP_PROJECT = "stub-project"
+    advisor_ensemble.GCP_QWEN_MODEL = "stub-model"
+    advisor_ensemble._get_gcp_auth = lambda: "stub-token"
+    advisor_ensemble.ENSEMBLE_HARD_DEADLINE = 0.1
+    try:
+        start = time.time()
+        result = query_single_advisor("gcp_qwen", "m-slots", "prompt")
+        elapsed = time.time() - start
+    finally:
+        (advisor_ensemble.GCP_PROJECT, advisor_ensemble.GCP_QWEN_MODEL,
+         advisor_ensemble._get_gcp_auth, advisor_ensemble.ENSEMBLE_HARD_DEADLINE) = saved
+        for _ in range(held):
+            slots.release()
+
+    assert not result["success"], "busy slots should fail the call"
+    assert "slot" in result["error"], f"unexpected error: {result['error']}"
+    assert elapsed < 1.0, f"slot wait not bounded ({elapsed:.2f}s)"
+    assert advisor_ensemble._get_breaker("gcp_qwen", "m-slots").failures == 1, "breaker did not see the failure"
+    print(f"  OK: failed after {elapsed:.2f}s, counted by the breaker")
+
+    print("PASS: Slot waits are bounded\n")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 70)
+    print("ADVISOR ENSEMBLE TESTS")
+    print("=" * 70)
+
+    try:
+        test_breaker_opens_after_fail_max()
+        test_half_open_single_trial()
+        test_success_closes_breaker()
+        test_quorum_early_return()
+        test_slot_wait_times_out()
+
+        print("=" * 70)
+        print("ALL TESTS PASSED!")
+        print("=" * 70)
+
+    except AssertionError as e:
+        print(f"\nTEST FAILED: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -123,6 +123,42 @@ def test_pillar_preferences():
     print("PASS: Pillar preferences checked\n")
 
 
+def test_pillar_fallback():
+    """Test that a pillar falls back to its alternate method while on cooldown."""
+    print("\n=== Test 2b: Pillar Fallback ===")
+
+    search = MockSearchInterface()
+    grounding = MockGroundingClient()
+    viability = MockViabilityMonitor()
+
+    manager = AutoGroundingManager(search, grounding, viability)
+
+    viability_result = {'viable': True}
+    collapse_status = {'warning_count': 2}
+
+    # First LOGOS intervention uses the advisor and starts its cooldown
+    result = manager.check_and_inject(100, 'LOGOS', viability_result, collapse_status)
+    assert result['type'] == 'advisor', f"Expected advisor, got {result['type']}"
+
+    # Advisor on cooldown: LOGOS should fall back to context
+    print("LOGOS with advisor on cooldown: Should fall back to context...")
+    result = manager.check_and_inject(110, 'LOGOS', viability_result, collapse_status)
+    assert result['type'] == 'context', f"Expected context fallback, got {result['type']}"
+    assert manager.interventions['fallback_to_context'] == 1
+    print("  OK")
+
+    # Both on cooldown: no intervention
+    result = manager.check_and_inject(120, 'LOGOS', viability_result, collapse_status)
+    assert result is None, "Both methods on cooldown should skip intervention"
+
+    # Unknown pillars default to context-first
+    manager.last_context_injection = 0.0
+    result = manager.check_and_inject(130, 'UNKNOWN', viability_result, collapse_status)
+    assert result['type'] == 'context', f"Expected context default, got {result['type']}"
+
+    print("PASS: Pillar fallback works\n")
+
+
 def test_viability_violations():
     """Test viability violation thresholds."""
     print("\n=== Test 3: Viability Violation Thresholds ===")
@@ -203,6 +239,43 @@ def test_grounding_events_recorded():
     print("PASS: Grounding events properly recorded\n")
 
 
+def test_combined_counted_once():
+    """Test that a combined intervention is counted and logged exactly once."""
+    print("\n=== Test 4b: Combined Intervention Accounting ===")
+
+    search = MockSearchInterface()
+    grounding = MockGroundingClient()
+    viability = MockViabilityMonitor()
+
+    manager = AutoGroundingManager(search, grounding, viability)
+
+    result = manager.check_and_inject(
+        100, 'LOGOS',
+        viability_result={'viable': False, 'margin': -0.6},
+        collapse_status={'warning_count': 0}
+    )
+    assert result['type'] == 'combined'
+    assert result['context'] is not None and result['advice'] is not None
+
+    # Both grounding calls ran and were recorded for C_eff...
+    assert search.search_calls == 1 and grounding.advisor_calls == 1
+    assert len(viability.events) == 2
+
+    # ...but only the combined intervention is counted and logged
+    assert manager.interventions['combined'] == 1
+    assert manager.interventions['context'] == 0
+    assert manager.interventions['advisor'] == 0
+    assert len(manager.intervention_history) == 1
+    assert manager.get_status()['total_interventions'] == 1
+
+    # Both cooldowns are charged once
+    assert manager.last_context_injection > 0
+    assert manager.last_advisor_injection > 0
+    print("  OK")
+
+    print("PASS: Combined intervention counted once\n")
+
+
 def test_status_reporting():
     """Test status reporting functionality."""
     print("\n=== Test 5: Status Reporting ===")
@@ -244,8 +317,10 @@ def main():
     try:
         test_intervention_timing()
         test_pillar_preferences()
+        test_pillar_fallback()
         test_viability_violations()
         test_grounding_events_recorded()
+        test_combined_counted_once()
         test_status_reporting()
 
         print("=" * 70)
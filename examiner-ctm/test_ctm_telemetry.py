@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Unit Test for CTM Telemetry Sidecar
+
+Runs a real sidecar on a free local port and checks subprotocol negotiation
+and delivery of pushed payloads. WebSocket tests are skipped when websockets
+isn't installed.
+"""
+
+import sys
+import json
+import time
+import socket
+import asyncio
+import threading
+import ctm_telemetry
+from ctm_telemetry import (
+    CTMTelemetry, BATCH_SUBPROTOCOL, MSGPACK_SUBPROTOCOL, _select_subprotocol
+)
+
+if ctm_telemetry.HAS_WEBSOCKETS:
+    import websockets
+if ctm_telemetry.HAS_MSGPACK:
+    import msgpack
+
+
+def free_port():
+    """Ask the OS for an unused local port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def connect(port, subprotocols=None):
+    """Connect to the sidecar, retrying while its thread is still starting up."""
+    deadline = time.monotonic() + 5.0
+    while True:
+        try:
+            return await websockets.connect(f"ws://127.0.0.1:{port}", subprotocols=subprotocols)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def decode(frame):
+    """Text frames are JSON, binary frames are msgpack."""
+    if isinstance(frame, bytes):
+        return msgpack.unpackb(frame, strict_map_key=False)
+    return json.loads(frame)
+
+
+def payloads(frame):
+    """Frame -> list of payloads (batch frames are unpacked)."""
+    message = decode(frame)
+    return message["items"] if message["type"] == "batch" else [message]
+
+
+async def receive_steps(ws, count, timeout=5.0):
+    """Collect frames until `count` metrics payloads arrived; returns (frames, steps)."""
+    frames, steps = [], []
+    deadline = time.monotonic() + timeout
+    while len(steps) < count:
+        frame = await asyncio.wait_for(ws.recv(), max(deadline - time.monotonic(), 0.01))
+        frames.append(frame)
+        steps.extend(p["iteration"] for p in payloads(frame) if p["type"] == "metrics")
+    return frames, steps
+
+
+def test_select_subprotocol_signatures():
+    """Selector works with both the new (connection, offered) and legacy (offered, server) calls."""
+    print("\n=== Test 1: Subprotocol Selector Signatures ===")
+
+    connection = object()
+    assert _select_subprotocol(connection, []) is None
+    assert _select_subprotocol(connection, ["other"]) is None
+    assert _select_subprotocol(connection, [BATCH_SUBPROTOCOL]) == BATCH_SUBPROTOCOL
+    assert _select_subprotocol([BATCH_SUBPROTOCOL], ctm_telemetry.SUBPROTOCOLS) == BATCH_SUBPROTOCOL
+    assert _select_subprotocol(["other"], ctm_telemetry.SUBPROTOCOLS) is None
+
+    expected = MSGPACK_SUBPROTOCOL if ctm_telemetry.HAS_MSGPACK else BATCH_SUBPROTOCOL
+    offered = [BATCH_SUBPROTOCOL, MSGPACK_SUBPROTOCOL]
+    assert _select_subprotocol(connection, offered) == expected
+    assert _select_subprotocol(offered, ctm_telemetry.SUBPROTOCOLS) == expected
+    print(f"  OK: both call styles pick {expected}")
+
+    print("PASS: Selector handles both websockets APIs\n")
+
+
+def test_subprotocol_negotiation():
+    """Each subprotocol negotiates on the running websockets version and gets its framing."""
+    print("\n=== Test 2: Subprotocol Negotiation ===")
+    if not ctm_telemetry.HAS_WEBSOCKETS:
+        print("SKIP: websockets not installed\n")
+        return
+
+    telemetry = CTMTelemetry(port=free_port())
+    cases = [(None, None, str, False), ([BATCH_SUBPROTOCOL], BATCH_SUBPROTOCOL, str, True)]
+    if ctm_telemetry.HAS_MSGPACK:
+        cases.append(([MSGPACK_SUBPROTOCOL], MSGPACK_SUBPROTOCOL, bytes, True))
+
+    async def run(offered, expected, frame_type, batched):
+        ws = await connect(telemetry.port, offered)
+        try:
+            assert ws.subprotocol == expected, f"offered {offered}, negotiated {ws.subprotocol}"
+            await asyncio.sleep(0.1)  # let the handler park on the waiter
+            for step in range(20):
+                telemetry.push_metrics({"step": step})
+            frames, steps = await receive_steps(ws, 20)
+        finally:
+            await ws.close()
+        assert steps == list(range(20)), f"payloads out of order: {steps}"
+        assert all(isinstance(f, frame_type) for f in frames), "wrong frame type"
+        if batched:
+            assert all(decode(f)["type"] == "batch" for f in frames), "expected batch frames"
+        else:
+            assert len(frames) == 20, "unbatched client should get one frame per payload"
+        print(f"  OK: offered {offered} -> {expected}, {len(frames)} frame(s)")
+
+    for case in cases:
+        asyncio.run(run(*case))
+
+    print(f"PASS: Negotiation works on websockets {websockets.__version__}\n")
+
+
+def test_burst_delivered_in_order():
+    """A burst pushed from another thread arrives complete and in order, with coalesced wakes."""
+    print("\n=== Test 3: Burst Delivery ===")
+    if not ctm_telemetry.HAS_WEBSOCKETS:
+        print("SKIP: websockets not installed\n")
+        return
+
+    telemetry = CTMTelemetry(port=free_port())
+    wakes = []
+    real_wake = telemetry._wake
+    telemetry._wake = lambda: (wakes.append(1), real_wake())
+    pushes = 2000
+
+    async def run():
+        ws = await connect(telemetry.port)
+        try:
+            await asyncio.sleep(0.1)
+            producer = threading.Thread(
+                target=lambda: [telemetry.push_metrics({"step": i}) for i in range(pushes)])
+            producer.start()
+            _, steps = await receive_steps(ws, pushes)
+            producer.join()
+        finally:
+            await ws.close()
+        return steps
+
+    steps = asyncio.run(run())
+    assert steps == list(range(pushes)), "burst delivered out of order or incomplete"
+    print(f"  OK: {pushes} payloads in order")
+    assert len(wakes) < pushes, f"wakes not coalesced: {len(wakes)} for {pushes} pushes"
+    print(f"  OK: {len(wakes)} wake callbacks for {pushes} pushes")
+
+    print("PASS: Bursts are delivered in order\n")
+
+
+def test_disconnected_client_does_not_swallow():
+    """A client that went away must not take payloads meant for a live one."""
+    print("\n=== Test 4: Disconnected + Live Client ===")
+    if not ctm_telemetry.HAS_WEBSOCKETS:
+        print("SKIP: websockets not installed\n")
+        return
+
+    telemetry = CTMTelemetry(port=free_port())
+
+    async def run():
+        gone = await connect(telemetry.port)
+        live = await connect(telemetry.port)
+        try:
+            await asyncio.sleep(0.1)
+            await gone.close()
+            await asyncio.sleep(0.2)  # let the server notice the close
+            assert telemetry._client_count == 1, f"expected 1 client, got {telemetry._client_count}"
+            for step in range(20):
+                telemetry.push_metrics({"step": step})
+            _, steps = await receive_steps(live, 20)
+        finally:
+            await live.close()
+        return steps
+
+    steps = asyncio.run(run())
+    assert steps == list(range(20)), f"live client missed payloads: {steps}"
+    print("  OK: live client got all 20 payloads")
+
+    print("PASS: Disconnected clients don't swallow payloads\n")
+
+
+class RacingLoop:
+    """Event loop proxy whose create_future first runs a hook.
+
+    handle_client creates its waiter right after finding the deque empty, so
+    the hook lands a push exactly in the gap between drain and park.
+    """
+
+    def __init__(self, loop, before_park):
+        self._loop = loop
+        self._before_park = before_park
+
+    def __getattr__(self, name):
+        return getattr(self._loop, name)
+
+    def create_future(self):
+        self._before_park()
+        return self._loop.create_future()
+
+
+def test_host_loop_and_push_during_drain():
+    """loop= serves from the caller's loop; a push racing the drain is still delivered."""
+    print("\n=== Test 5: Host Loop + Push During Drain ===")
+    if not ctm_telemetry.HAS_WEBSOCKETS:
+        print("SKIP: websockets not installed\n")
+        return
+
+    async def run():
+        raced = []
+
+        def push_from_other_thread():
+            if raced:
+                return
+            raced.append(1)
+            pusher = threading.Thread(target=telemetry.push_metrics, args=({"step": 1},))
+            pusher.start()
+            pusher.join()
+
+        threads_before = threading.active_count()
+        host_loop = RacingLoop(asyncio.get_running_loop(), push_from_other_thread)
+        telemetry = CTMTelemetry(port=free_port(), loop=host_loop)
+        await asyncio.sleep(0)  # let the scheduled sidecar task start
+        assert telemetry.loop is host_loop, "host loop not used"
+        assert threading.active_count() == threads_before, "host mode started a sidecar thread"
+
+        ws = await connect(telemetry.port)
+        try:
+            _, steps = await receive_steps(ws, 1, timeout=2.0)
+            assert raced, "race hook never ran"
+            telemetry.push_metrics({"step": 2})
+            _, more = await receive_steps(ws, 1, timeout=2.0)
+        finally:
+            await ws.close()
+        return steps + more
+
+    steps = asyncio.run(run())
+    assert steps == [1, 2], f"expected [1, 2], got {steps}"
+    print("  OK: sidecar ran on the host loop without its own thread")
+    print("  OK: push racing the drain was delivered, and the next push too")
+
+    print("PASS: Host loop mode and drain race\n")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 70)
+    print("CTM TELEMETRY SIDECAR TESTS")
+    print("=" * 70)
+
+    try:
+        test_select_subprotocol_signatures()
+        test_subprotocol_negotiation()
+        test_burst_delivered_in_order()
+        test_disconnected_client_does_not_swallow()
+        test_host_loop_and_push_during_drain()
+
+        print("=" * 70)
+        print("ALL TESTS PASSED!")
+        print("=" * 70)
+
+    except AssertionError as e:
+        print(f"\nTEST FAILED: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
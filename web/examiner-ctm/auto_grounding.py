@@ -15,11 +15,13 @@ Key Features:
 - Automatic fallback strategies when preferred method is on cooldown
 """
 
+import os
 import time
 import json
+import atexit
 from typing import Optional, Dict, Any
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 class AutoGroundingManager:
@@ -58,6 +60,17 @@ class AutoGroundingManager:
         self.viability = viability_monitor
         self.log_file = Path(log_file)
 
+        # Intervention log is held open and flushed in batches rather than
+        # reopened per entry (collapse cascades log many entries back-to-back)
+        self.log_flush_every = 16
+        # Size-based rotation: log -> log.1 -> ... -> log.<backup_count>
+        self.log_max_bytes = 16 * 1024 * 1024
+        self.log_backup_count = 5
+        self._log_handle = None
+        self._unflushed_entries = 0
+        # Registered once here, not on each (re)open after a rotation
+        atexit.register(self.close)
+
         # Intervention severity thresholds (C_eff - E margin)
         self.thresholds = {
             'light': -0.1,          # Minor viability violation
@@ -84,6 +97,13 @@ class AutoGroundingManager:
             'OIKOS': 'context'      # Economics -> scarcity data
         }
 
+        # Precomputed (primary, fallback, fallback stat key, fallback note) per pillar
+        self._default_dispatch = self._dispatch_for('context')
+        self._pillar_dispatch = {
+            pillar: self._dispatch_for(preference)
+            for pillar, preference in self.pillar_preferences.items()
+        }
+
         # Intervention statistics
         self.interventions = {
             'context': 0,
@@ -214,35 +234,28 @@ class AutoGroundingManager:
         Returns:
             Intervention result dict or None
         """
-        preference = self.pillar_preferences.get(domain, 'context')
-
-        if preference == 'advisor':
-            # Try advisor first
-            result = self._inject_advisor(step, domain, reason, force=False)
-
-            if result is None:
-                # Advisor on cooldown, try context as fallback
-                result = self._inject_context(step, domain, reason, force=False)
-                if result is not None:
-                    self.interventions['fallback_to_context'] += 1
-                    print(f"[AUTO-GROUNDING] {domain} advisor on cooldown, "
-                          f"falling back to context injection")
+        primary, fallback, fallback_key, fallback_note = self._pillar_dispatch.get(
+            domain, self._default_dispatch
+        )
 
-            return result
+        result = primary(step, domain, reason, force=False)
 
-        else:  # 'context'
-            # Try context first
-            result = self._inject_context(step, domain, reason, force=False)
+        if result is None:
+            # Preferred method on cooldown, try the alternative
+            result = fallback(step, domain, reason, force=False)
+            if result is not None:
+                self.interventions[fallback_key] += 1
+                print(f"[AUTO-GROUNDING] {domain} {fallback_note}")
 
-            if result is None:
-                # Context on cooldown, try advisor as fallback
-                result = self._inject_advisor(step, domain, reason, force=False)
-                if result is not None:
-                    self.interventions['fallback_to_advisor'] += 1
-                    print(f"[AUTO-GROUNDING] {domain} context on cooldown, "
-                          f"falling back to advisor injection")
+        return result
 
-            return result
+    def _dispatch_for(self, preference: str):
+        """Resolve a pillar preference into its injection order and fallback bookkeeping."""
+        if preference == 'advisor':
+            return (self._inject_advisor, self._inject_context, 'fallback_to_context',
+                    "advisor on cooldown, falling back to context injection")
+        return (self._inject_context, self._inject_advisor, 'fallback_to_advisor',
+                "context on cooldown, falling back to advisor injection")
 
     def _inject_context(
         self,
@@ -267,32 +280,13 @@ class AutoGroundingManager:
             Dict with context data or None if on cooldown
         """
         # Adaptive cooldown: respect unless force=True (critical violations)
-        if not force:
-            time_since_last = time.time() - self.last_context_injection
-            if time_since_last < self.context_cooldown:
-                return None  # Still on cooldown
+        if self._on_cooldown(self.last_context_injection, self.context_cooldown, force):
+            return None  # Still on cooldown
 
-        # Perform web search for grounding
-        try:
-            context = self.search.search_web(
-                query=f"{domain} grounding semantic context",
-                force=force
-            )
-        except Exception as e:
-            print(f"[AUTO-GROUNDING] Context search failed: {e}")
+        grounding = self._do_context(step, domain, reason, force)
+        if grounding is None:
             return None
 
-        # Record grounding event for C_eff calculation
-        self.viability.record_grounding_event(
-            event_type='emergency_context',
-            metadata={
-                'step': step,
-                'domain': domain,
-                'reason': reason,
-                'force': force
-            }
-        )
-
         self.last_context_injection = time.time()
         self.interventions['context'] += 1
 
@@ -301,7 +295,7 @@ class AutoGroundingManager:
             'reason': reason,
             'step': step,
             'domain': domain,
-            'context': context
+            'context': grounding['context']
         }
 
         self._log_intervention(result)
@@ -330,33 +324,13 @@ class AutoGroundingManager:
             Dict with advisor advice or None if on cooldown
         """
         # Adaptive cooldown: respect unless force=True
-        if not force:
-            time_since_last = time.time() - self.last_advisor_injection
-            if time_since_last < self.advisor_cooldown:
-                return None  # Still on cooldown
+        if self._on_cooldown(self.last_advisor_injection, self.advisor_cooldown, force):
+            return None  # Still on cooldown
 
-        # Consult advisor ensemble
-        try:
-            advice = self.grounding.request_grounding(
-                domain=domain,
-                query=f"Critical grounding needed: {reason} at step {step}",
-                force=force
-            )
-        except Exception as e:
-            print(f"[AUTO-GROUNDING] Advisor consultation failed: {e}")
+        grounding = self._do_advisor(step, domain, reason, force)
+        if grounding is None:
             return None
 
-        # Record grounding event for C_eff calculation
-        self.viability.record_grounding_event(
-            event_type='emergency_advisor',
-            metadata={
-                'step': step,
-                'domain': domain,
-                'reason': reason,
-                'force': force
-            }
-        )
-
         self.last_advisor_injection = time.time()
         self.interventions['advisor'] += 1
 
@@ -365,7 +339,7 @@ class AutoGroundingManager:
             'reason': reason,
             'step': step,
             'domain': domain,
-            'advice': advice
+            'advice': grounding['advice']
         }
 
         self._log_intervention(result)
@@ -393,8 +367,21 @@ class AutoGroundingManager:
         Returns:
             Dict with both context and advice
         """
-        context_result = self._inject_context(step, domain, reason, force=force)
-        advisor_result = self._inject_advisor(step, domain, reason, force=force)
+        # Call the raw primitives so the combined intervention is counted,
+        # logged and charged against each cooldown exactly once
+        context_grounding = None
+        if not self._on_cooldown(self.last_context_injection, self.context_cooldown, force):
+            context_grounding = self._do_context(step, domain, reason, force)
+
+        advisor_grounding = None
+        if not self._on_cooldown(self.last_advisor_injection, self.advisor_cooldown, force):
+            advisor_grounding = self._do_advisor(step, domain, reason, force)
+
+        now = time.time()
+        if context_grounding is not None:
+            self.last_context_injection = now
+        if advisor_grounding is not None:
+            self.last_advisor_injection = now
 
         self.interventions['combined'] += 1
 
@@ -403,17 +390,96 @@ class AutoGroundingManager:
             'reason': reason,
             'step': step,
             'domain': domain,
-            'context': context_result.get('context') if context_result else None,
-            'advice': advisor_result.get('advice') if advisor_result else None
+            'context': context_grounding['context'] if context_grounding else None,
+            'advice': advisor_grounding['advice'] if advisor_grounding else None
         }
 
         self._log_intervention(result)
         return result
 
+    def _on_cooldown(self, last_injection: float, cooldown: float, force: bool) -> bool:
+        """True if a method used at last_injection is still cooling down (never when forced)."""
+        return not force and time.time() - last_injection < cooldown
+
+    def _do_context(
+        self,
+        step: int,
+        domain: str,
+        reason: str,
+        force: bool
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run the context search and record the grounding event.
+
+        No cooldown, statistics or logging; callers own that bookkeeping.
+
+        Returns:
+            {'context': ...} or None if the search failed
+        """
+        # Perform web search for grounding
+        try:
+            context = self.search.search_web(
+                query=f"{domain} grounding semantic context",
+                force=force
+            )
+        except Exception as e:
+            print(f"[AUTO-GROUNDING] Context search failed: {e}")
+            return None
+
+        # Record grounding event for C_eff calculation
+        self.viability.record_grounding_event(
+            event_type='emergency_context',
+            metadata={
+                'step': step,
+                'domain': domain,
+                'reason': reason,
+                'force': force
+            }
+        )
+        return {'context': context}
+
+    def _do_advisor(
+        self,
+        step: int,
+        domain: str,
+        reason: str,
+        force: bool
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Consult the advisor ensemble and record the grounding event.
+
+        No cooldown, statistics or logging; callers own that bookkeeping.
+
+        Returns:
+            {'advice': ...} or None if the consultation failed
+        """
+        # Consult advisor ensemble
+        try:
+            advice = self.grounding.request_grounding(
+                domain=domain,
+                query=f"Critical grounding needed: {reason} at step {step}",
+                force=force
+            )
+        except Exception as e:
+            print(f"[AUTO-GROUNDING] Advisor consultation failed: {e}")
+            return None
+
+        # Record grounding event for C_eff calculation
+        self.viability.record_grounding_event(
+            event_type='emergency_advisor',
+            metadata={
+                'step': step,
+                'domain': domain,
+                'reason': reason,
+                'force': force
+            }
+        )
+        return {'advice': advice}
+
     def _log_intervention(self, result: Dict[str, Any]):
         """Log intervention to JSONL file and memory."""
         entry = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
             'step': result.get('step'),
             'domain': result.get('domain'),
             'type': result.get('type'),
@@ -424,13 +490,44 @@ class AutoGroundingManager:
 
         # Append to JSONL log
         try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(entry) + '\n')
+            if self._log_handle is None:
+                self._log_handle = open(self.log_file, 'a', encoding='utf-8', buffering=64 * 1024)
+            self._log_handle.write(json.dumps(entry) + '\n')
+            self._unflushed_entries += 1
+            if self._unflushed_entries >= self.log_flush_every:
+                self.flush_log()
         except Exception as e:
             print(f"[AUTO-GROUNDING] Failed to log intervention: {e}")
 
+    def flush_log(self):
+        """Flush buffered intervention log entries to disk, rotating if oversized."""
+        if self._log_handle is not None:
+            self._log_handle.flush()
+            if self._log_handle.tell() >= self.log_max_bytes:
+                self._rotate_log()
+        self._unflushed_entries = 0
+
+    def _rotate_log(self):
+        """Shift log.N -> log.N+1 (dropping the oldest) and start a fresh log file."""
+        self.close()
+        for i in range(self.log_backup_count - 1, 0, -1):
+            src = Path(f"{self.log_file}.{i}")
+            if src.exists():
+                os.replace(src, f"{self.log_file}.{i + 1}")
+        if self.log_file.exists():
+            os.replace(self.log_file, f"{self.log_file}.1")
+
+    def close(self):
+        """Flush and close the intervention log."""
+        if self._log_handle is not None:
+            self._log_handle.close()
+            self._log_handle = None
+        self._unflushed_entries = 0
+
     def get_status(self) -> Dict[str, Any]:
         """Get current auto-grounding status summary."""
+        self.flush_log()
+        now = time.time()  # one clock read for both cooldown computations
         total_interventions = (
             self.interventions['context'] +
             self.interventions['advisor'] +
@@ -448,11 +545,11 @@ class AutoGroundingManager:
             'last_advisor_injection': self.last_advisor_injection,
             'context_cooldown_remaining': max(
                 0,
-                self.context_cooldown - (time.time() - self.last_context_injection)
+                self.context_cooldown - (now - self.last_context_injection)
             ),
             'advisor_cooldown_remaining': max(
                 0,
-                self.advisor_cooldown - (time.time() - self.last_advisor_injection)
+                self.advisor_cooldown - (now - self.last_advisor_injection)
             )
         }
 
@@ -291,11 +291,12 @@ class EnsembleHealthMonitor:
 
     def export_report(self, filename: Optional[str] = None) -> None:
         """Export comprehensive report to JSON"""
-        filename = filename or f"ensemble_health_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        now = datetime.now()  # single clock read keeps filename and payload timestamps consistent
+        filename = filename or f"ensemble_health_{now.strftime('%Y%m%d_%H%M%S')}.json"
         filepath = self.storage_dir / filename
 
         report = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "ensemble_summary": self.check_ensemble_health(),
             "model_details": {key: m.to_dict() for key, m in self.models.items()},
             "model_recommendations": self.get_model_recommendations(),
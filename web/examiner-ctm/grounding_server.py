@@ -35,8 +35,9 @@ async def handle_request(websocket):
             
             print(f"[{datetime.now().isoformat()}] {pillar}: {query[:50]}...", flush=True)
             
-            # Multi-advisor ensemble (3 models)
-            result = query_ensemble(query, logic_gap, pillar)
+            # Multi-advisor ensemble, run off the event loop so other
+            # connections (and websocket keep-alive pings) are served meanwhile
+            result = await asyncio.to_thread(query_ensemble, query, logic_gap, pillar)
             
             response = {
                 "request_id": req.get("request_id"),